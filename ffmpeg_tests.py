@@ -24,7 +24,8 @@ FFmpeg QP Test Suite — CLI-утилита для тестирования ви
     crf (int)    - constant rate factor (только для программных кодеков, опционален)
     scale (str)  - "1080p", "4k", "original" (по умолчанию)
     fps (int)    - желаемая частота кадров
-    hw (0/1)     - 1 = аппаратное кодирование (vaapi), 0 = программное
+    hw (str)     - "vaapi", "nvenc", "qsv" или "none" (0/1 принимаются как none/vaapi)
+    hw_device (str) - конкретное устройство, например "/dev/dri/renderD129"
     codec (str)  - "x264", "x265", "av1" (по умолчанию "x265")
     preset (str/int) -
         - для x264/x265: "ultrafast", "fast", "medium", "slow" (по умолчанию "medium")
@@ -47,39 +48,131 @@ import time
 import shutil
 import subprocess
 import argparse
+import threading
+import concurrent.futures
+import selectors
+import collections
 from typing import List, Dict, Any, Optional
 from dataclasses import dataclass
 from pathlib import Path
 import platform
-import re
 
 @dataclass
 class TestConfig:
     qp: int
     scale: str = "original"
     fps: Optional[int] = None
-    hw: int = 0
+    hw: str = "none"  # "none", "vaapi", "nvenc", "qsv" (0/1 принимаются для совместимости)
     codec: str = "x265"
     preset: Any = "medium"  # Может быть str или int для av1
     crf: Optional[int] = None  # Новый параметр
     duration: Optional[int] = None  # Новый параметр
+    scale_mode: Optional[str] = None  # Режим scale_vaapi: "fast", "hq", "default"
+    hw_device: Optional[str] = None  # Конкретное устройство (например /dev/dri/renderD129)
+    tune: Optional[str] = None  # "zerolatency", "fastdecode", "fast", "none"
 
 @dataclass
 class TestResult:
     input_file: str
     output_file: str
     config: TestConfig
-    file_size: int
-    bitrate: float
-    compression_ratio: float
+    file_size: Optional[int]  # None в режиме --benchmark (нет выходного файла)
+    bitrate: Optional[float]
+    compression_ratio: Optional[float]
     duration: float
     encoding_time: float
 
+# Кодеки, которые VAAPI в принципе умеет декодировать аппаратно; реальный
+# список зависит от профилей драйвера и проверяется через vainfo
+VAAPI_DECODABLE_CODECS = {"h264", "hevc", "vp9", "av1"}
+
+# Соответствие имени кодека префиксу VA-профиля в выводе vainfo
+VAAPI_PROFILE_PREFIXES = {
+    "h264": "VAProfileH264",
+    "hevc": "VAProfileHEVC",
+    "vp9": "VAProfileVP9",
+    "av1": "VAProfileAV1",
+}
+
+# Целевое число ядер на один программный кодировщик: по нему main()
+# рассчитывает размер пула воркеров (фактические -threads затем делятся
+# по реальному числу воркеров, см. sw_threads)
+THREADS_PER_ENCODE = 4
+
+# Допустимые диапазоны qp/crf по кодекам: значение вне диапазона ffmpeg
+# отвергает (или молча кодирует мусор) уже после инициализации конвейера,
+# поэтому проверяем до запуска
+CODEC_QP_RANGES = {"x264": (0, 51), "x265": (0, 51), "av1": (1, 63)}
+CODEC_CRF_RANGES = {"x264": (0, 51), "x265": (0, 51), "av1": (0, 63)}
+
+# Параметры libsvtav1 по классу пресета: тайлы дают почти линейный прирост
+# скорости по ядрам, а для realtime-пресетов дополнительно отключаем
+# lookahead и restoration-фильтр
+SVT_AV1_PARAMS = {
+    "quality": "tile-columns=1:tile-rows=0",                                       # пресеты 0-4
+    "balanced": "tile-columns=2:tile-rows=1:fast-decode=1",                        # пресеты 5-8
+    "realtime": "tile-columns=2:tile-rows=1:fast-decode=1:enable-restoration=0:lookahead=0",  # пресеты 9-13
+}
+
+# Шаблоны параметров кодировщика по (кодек, режим). Скелет команды
+# предвычислен один раз; на каждый тест остаётся подстановка значений
+# через format_map. Плейсхолдеры: {rate_flag}/{rate} — -crf или -qp,
+# {preset}, {threads}, {svtav1_params} (см. _encoder_args)
+ENCODER_TEMPLATES = {
+    ("x265", "vaapi"): ["-c:v", "hevc_vaapi", "-qp", "{qp}", "-preset", "{preset}"],
+    ("x264", "vaapi"): ["-c:v", "h264_vaapi", "-qp", "{qp}", "-preset", "{preset}"],
+    ("av1", "vaapi"): ["-c:v", "av1_vaapi", "-qp", "{qp}", "-preset", "{preset}"],
+    ("x265", "nvenc"): ["-c:v", "hevc_nvenc", "-preset", "{preset}", "-cq", "{qp}"],
+    ("x264", "nvenc"): ["-c:v", "h264_nvenc", "-preset", "{preset}", "-cq", "{qp}"],
+    ("av1", "nvenc"): ["-c:v", "av1_nvenc", "-preset", "{preset}", "-cq", "{qp}"],
+    ("x265", "qsv"): ["-c:v", "hevc_qsv", "-preset", "{preset}", "-q", "{qp}"],
+    ("x264", "qsv"): ["-c:v", "h264_qsv", "-preset", "{preset}", "-q", "{qp}"],
+    ("av1", "qsv"): ["-c:v", "av1_qsv", "-preset", "{preset}", "-q", "{qp}"],
+    ("x265", "sw"): ["-c:v", "libx265", "{rate_flag}", "{rate}", "-preset", "{preset}",
+                     "-threads", "{threads}"],
+    ("x264", "sw"): ["-c:v", "libx264", "{rate_flag}", "{rate}", "-preset", "{preset}",
+                     "-threads", "{threads}"],
+    # Большой интервал ключевых кадров (-g 240), чтобы пул потоков
+    # кодировщика не простаивал на границах GOP
+    ("av1", "sw"): ["-c:v", "libsvtav1", "{rate_flag}", "{rate}", "-preset", "{preset}",
+                    "-svtav1-params", "{svtav1_params}", "-g", "240",
+                    "-threads", "{threads}"],
+}
+
 class FFmpegQPTest:
-    def __init__(self):
+    def __init__(self, quiet: bool = False, benchmark: bool = False):
         self.ffmpeg_path = self._find_ffmpeg()
+        self.quiet = quiet
+        self.benchmark = benchmark
         self.results: List[TestResult] = []
-        
+        # SoA-хранилище результатов: по списку на колонку таблицы,
+        # чтобы сортировки/агрегации не ходили по цепочкам атрибутов
+        self.results_columns: Dict[str, list] = {
+            key: [] for key in (
+                'file', 'qp', 'crf', 'preset', 'scale', 'fps',
+                'codec', 'mode', 'size', 'bitrate', 'ratio', 'time'
+            )
+        }
+        self._vaapi_decodable_cache: Dict[str, bool] = {}
+        self._vaapi_decode_profiles: Optional[set] = None
+        # Кэш метаданных входного файла: при серии из N тестов нет смысла
+        # запускать ffprobe для одного и того же файла N+1 раз
+        self._probe_cache: Dict[Any, Dict[str, Any]] = {}
+        self._default_scale_mode: Optional[str] = None
+        self._scale_mode_probed = False
+        # Потоки одного программного кодировщика. По умолчанию — все ядра
+        # (одиночный тест не должен простаивать); при параллельном запуске
+        # main() делит ядра между воркерами
+        self.sw_threads = os.cpu_count() or 1
+        # Аппаратные кодирования сериализуем по числу движков бэкенда,
+        # иначе параллельные тесты будут драться за один GPU
+        self._hw_semaphores = {
+            "vaapi": threading.Semaphore(self._count_vaapi_engines()),
+            "qsv": threading.Semaphore(self._count_vaapi_engines()),
+            "nvenc": threading.Semaphore(1),
+        }
+        self._check_simd()
+
     def _find_ffmpeg(self) -> str:
         """Находит путь к FFmpeg в системе"""
         ffmpeg = shutil.which("ffmpeg")
@@ -87,19 +180,78 @@ class FFmpegQPTest:
             raise RuntimeError("FFmpeg не найден в системе")
         return ffmpeg
 
-    def _check_hw_support(self) -> bool:
-        """Проверяет поддержку аппаратного ускорения"""
+    def _check_simd(self):
+        """Одноразовая проверка, что FFmpeg собран с SIMD-оптимизациями.
+
+        Без ассемблерных ядер (AVX2/AVX-512) x265 и SVT-AV1 работают в
+        2-4 раза медленнее, причём молча. Проверка выполняется один раз
+        при старте и ничего не стоит на пути кодирования.
+        """
+        if platform.machine() not in ("x86_64", "AMD64"):
+            return
+
+        try:
+            cpuinfo = Path("/proc/cpuinfo").read_text()
+        except OSError:
+            return
+        has_avx2 = " avx2" in cpuinfo
+        has_avx512 = " avx512f" in cpuinfo
+
+        try:
+            result = subprocess.run(
+                [self.ffmpeg_path, "-hide_banner", "-buildconf"],
+                capture_output=True, text=True
+            )
+        except OSError:
+            return
+
+        if "--disable-asm" in result.stdout:
+            print("Предупреждение: FFmpeg собран без ассемблерных оптимизаций "
+                  "(--disable-asm) — программное кодирование будет в разы медленнее")
+        if not has_avx2:
+            print("Предупреждение: CPU не поддерживает AVX2 — "
+                  "SIMD-ядра x265/SVT-AV1 будут недоступны")
+        elif has_avx512:
+            # Напрямую из бинарника не видно, собран ли SVT-AV1 с AVX-512;
+            # подсказываем, где искать, если скорость AV1 ниже ожидаемой
+            print("Примечание: CPU поддерживает AVX-512 — убедитесь, что "
+                  "SVT-AV1 собран с -DENABLE_AVX512=ON, иначе часть скорости теряется")
+
+    def _count_vaapi_engines(self) -> int:
+        """Определяет число доступных VAAPI-движков (render-узлов /dev/dri)"""
+        try:
+            engines = len([d for d in os.listdir("/dev/dri") if d.startswith("renderD")])
+        except OSError:
+            engines = 0
+        return max(1, engines)
+
+    def _check_hw_support(self, hw: str = "vaapi") -> bool:
+        """Проверяет поддержку аппаратного ускорения для выбранного бэкенда"""
+        if hw == "nvenc":
+            return shutil.which("nvidia-smi") is not None
+        # vaapi и qsv работают через render-узлы DRI
         if platform.system() != "Linux":
             return False
-        return os.path.exists("/dev/dri/renderD128")
+        try:
+            return any(d.startswith("renderD") for d in os.listdir("/dev/dri"))
+        except OSError:
+            return False
 
     def _validate_config(self, config: Dict[str, Any]) -> TestConfig:
         """Валидирует конфигурацию теста"""
         if "qp" not in config and "crf" not in config:
             raise ValueError("QP или CRF является обязательным параметром")
-        if config.get("hw", 0) == 1 and not self._check_hw_support():
+        hw = config.get("hw", "none")
+        # Обратная совместимость: раньше hw задавался числом 0/1
+        if hw in (0, "0", False, None):
+            hw = "none"
+        elif hw in (1, "1", True):
+            hw = "vaapi"
+        if hw not in ("none", "vaapi", "nvenc", "qsv"):
+            raise ValueError("hw должен быть \"none\", \"vaapi\", \"nvenc\" или \"qsv\" (или 0/1)")
+        if hw != "none" and not self._check_hw_support(hw):
             print("Предупреждение: Аппаратное ускорение недоступно, переключение на программное кодирование")
-            config["hw"] = 0
+            hw = "none"
         codec = config.get("codec", "x265")
         # Для av1 preset по умолчанию 8 (число), для остальных medium (строка)
         if codec == "av1":
@@ -114,138 +266,320 @@ class FFmpegQPTest:
         else:
             preset = config.get("preset", "medium")
         crf = config.get("crf")
+        # Падаем до запуска ffmpeg: неудачный параметр, обнаруженный после
+        # инициализации конвейера, стоит целого зря потраченного теста
+        if "qp" in config:
+            low, high = CODEC_QP_RANGES.get(codec, (0, 63))
+            if not (low <= config["qp"] <= high):
+                raise ValueError(f"qp={config['qp']} вне диапазона {low}-{high} для кодека {codec}")
+        if crf is not None:
+            low, high = CODEC_CRF_RANGES.get(codec, (0, 63))
+            if not (low <= crf <= high):
+                raise ValueError(f"crf={crf} вне диапазона {low}-{high} для кодека {codec}")
         duration = config.get("duration")
+        scale_mode = config.get("scale_mode")
+        if scale_mode is not None and scale_mode not in ("fast", "hq", "default"):
+            raise ValueError("scale_mode должен быть \"fast\", \"hq\" или \"default\"")
+        tune = config.get("tune")
+        if tune is not None and tune not in ("zerolatency", "fastdecode", "fast", "none"):
+            raise ValueError("tune должен быть \"zerolatency\", \"fastdecode\", \"fast\" или \"none\"")
         return TestConfig(
             qp=config.get("qp", 0),
             scale=config.get("scale", "original"),
             fps=config.get("fps"),
-            hw=config.get("hw", 0),
+            hw=hw,
             codec=codec,
             preset=preset,
             crf=crf,
-            duration=duration
+            duration=duration,
+            scale_mode=scale_mode,
+            tune=tune,
+            hw_device=config.get("hw_device")
         )
 
+    def _vaapi_scale_mode(self) -> Optional[str]:
+        """Определяет режим scale_vaapi по умолчанию (одноразовая проверка).
+
+        mode=fast направляет масштабирование на фиксированный блок SFC
+        (Scaler & Format Converter) Intel iGPU, освобождая EU-ядра для
+        кодировщика. Гейтим по работоспособности vainfo: без рабочего
+        VAAPI-стека оставляем режим драйвера по умолчанию.
+        """
+        if self._scale_mode_probed:
+            return self._default_scale_mode
+        self._scale_mode_probed = True
+        vainfo = shutil.which("vainfo")
+        if vainfo:
+            try:
+                result = subprocess.run(
+                    [vainfo, "--display", "drm"],
+                    capture_output=True, text=True
+                )
+                if result.returncode == 0:
+                    self._default_scale_mode = "fast"
+            except OSError:
+                pass
+        return self._default_scale_mode
+
+    def _get_vaapi_decode_profiles(self) -> set:
+        """Определяет кодеки, которые драйвер реально декодирует (VLD-профили).
+
+        Одноразовый разбор vainfo: наличие кодека в VAAPI_DECODABLE_CODECS
+        ещё не значит, что у конкретного iGPU есть профиль декодирования
+        (vp9/av1 на многих Intel отсутствуют). Без рабочего vainfo
+        консервативно считаем доступными только h264/hevc — они есть
+        практически везде, где есть VAAPI вообще.
+        """
+        if self._vaapi_decode_profiles is not None:
+            return self._vaapi_decode_profiles
+        profiles = {"h264", "hevc"}
+        vainfo = shutil.which("vainfo")
+        if vainfo:
+            try:
+                result = subprocess.run(
+                    [vainfo, "--display", "drm"],
+                    capture_output=True, text=True
+                )
+            except OSError:
+                result = None
+            if result is not None and result.returncode == 0:
+                found = set()
+                for line in result.stdout.splitlines():
+                    if "VAEntrypointVLD" not in line:
+                        continue
+                    for codec, prefix in VAAPI_PROFILE_PREFIXES.items():
+                        if prefix in line:
+                            found.add(codec)
+                if found:
+                    profiles = found
+        self._vaapi_decode_profiles = profiles
+        return profiles
+
+    def _is_vaapi_decodable(self, input_file: str) -> bool:
+        """Проверяет, может ли VAAPI декодировать входной файл аппаратно.
+
+        Если да, то при -hwaccel_output_format vaapi кадры уже находятся
+        в видеопамяти и цепочка format=vaapi,hwupload не нужна — она лишь
+        гоняет кадры через системную память туда и обратно. Если профиля
+        декодирования нет, ffmpeg откатится на программный декодер, и без
+        hwupload цепочка scale_vaapi/кодировщик упала бы на системных кадрах.
+        Результат кэшируется, чтобы не вызывать ffprobe для каждого теста.
+        """
+        if input_file not in self._vaapi_decodable_cache:
+            info = self._get_input_info(input_file)
+            self._vaapi_decodable_cache[input_file] = (
+                info['codec'] in VAAPI_DECODABLE_CODECS
+                and info['codec'] in self._get_vaapi_decode_profiles()
+            )
+        return self._vaapi_decodable_cache[input_file]
+
     def _get_scale_filter(self, scale: str, width: int, height: int) -> str:
         """Генерирует фильтр масштабирования"""
         if scale == "original":
             return ""
-        
+
         target_height = 1080 if scale == "1080p" else 2160
         return f"scale=-2:{target_height}"
 
-    def _build_ffmpeg_command(self, input_file: str, output_file: str, config: TestConfig) -> List[str]:
-        """Строит команду FFmpeg"""
+    def _is_interlaced(self, input_file: str) -> bool:
+        """Определяет по кэшированному ffprobe, чересстрочный ли вход"""
+        try:
+            probe = self._probe_input(input_file)
+            stream = next(s for s in probe['streams'] if s.get('codec_type') == 'video')
+        except (subprocess.CalledProcessError, json.JSONDecodeError, KeyError, StopIteration):
+            return False
+        return stream.get('field_order', 'progressive') not in ('progressive', 'unknown')
+
+    def _video_filters(self, input_file: str, config: TestConfig) -> List[str]:
+        """Возвращает список видеофильтров для конфигурации"""
+        # fps ставим ПЕРЕД масштабированием (и перед hwupload): кадры,
+        # которые всё равно будут выброшены, не должны проходить через
+        # дорогой ресайз и тем более пересекать PCIe
+        filters = []
+        if config.fps:
+            filters.append(f"fps={config.fps}")
+        target_height = 1080 if config.scale == "1080p" else 2160
+        if config.hw == "vaapi":
+            # Если декодер отдаёт кадры уже в видеопамяти (VAAPI), загрузка
+            # через системную память не нужна — оставляем кадры на GPU.
+            # При программном декодировании загружаем в nv12 — родной формат
+            # VAAPI: загрузка yuv420p добавила бы конвертацию на каждом кадре
+            if not self._is_vaapi_decodable(input_file):
+                filters.append("format=nv12,hwupload")
+            # Деинтерлейс сразу после hwupload включает VEBOX-конвейер;
+            # масштабирование, идущее следом, драйвер сливает с ним и
+            # выполняет на фиксированном блоке SFC вместо render-движка
+            if self._is_interlaced(input_file):
+                filters.append("deinterlace_vaapi=mode=default:rate=frame")
+            if config.scale != "original":
+                scale_expr = f"scale_vaapi=w=-2:h={target_height}"
+                mode = config.scale_mode or self._vaapi_scale_mode()
+                if mode and mode != "default":
+                    scale_expr += f":mode={mode}"
+                filters.append(scale_expr)
+        elif config.hw == "nvenc":
+            if config.scale != "original":
+                filters.append(f"scale_cuda=-2:{target_height}")
+        elif config.hw == "qsv":
+            if config.scale != "original":
+                filters.append(f"scale_qsv=-1:{target_height}")
+        else:
+            if config.scale != "original":
+                filters.append(self._get_scale_filter(config.scale, 0, 0))
+        return filters
+
+    def _encoder_args(self, config: TestConfig) -> List[str]:
+        """Возвращает параметры видеокодировщика (-c:v и настройки качества).
+
+        Вместо ветвистого if/elif на каждый тест — выбор готового шаблона
+        из ENCODER_TEMPLATES по (кодек, режим) и подстановка значений.
+        Добавление нового кодека — одна строка в таблице.
+        """
+        mode = "sw" if config.hw == "none" else config.hw
+        template = ENCODER_TEMPLATES.get((config.codec, mode))
+        if template is None:
+            # Неизвестный кодек — собираем по общей схеме
+            if mode == "sw":
+                template = ["-c:v", config.codec, "{rate_flag}", "{rate}",
+                            "-preset", "{preset}", "-threads", "{threads}"]
+            else:
+                template = ["-c:v", f"{config.codec}_{mode}", "-qp", "{qp}", "-preset", "{preset}"]
+
+        use_crf = mode == "sw" and config.crf is not None
+        values = {
+            "qp": config.qp,
+            "preset": config.preset,
+            "rate_flag": "-crf" if use_crf else "-qp",
+            "rate": config.crf if use_crf else config.qp,
+            # Потоки делятся между параллельными воркерами (см. sw_threads);
+            # одиночный тест получает все ядра
+            "threads": self.sw_threads,
+            "svtav1_params": self._svtav1_params(config.preset, config.tune) if config.codec == "av1" else "",
+        }
+        args = [arg.format_map(values) for arg in template]
+
+        tune = config.tune
+        if tune and tune != "none" and config.codec in ("x264", "x265"):
+            if mode == "sw":
+                # "fast" — сокращение для fastdecode без B-кадров
+                args.extend(["-tune", "fastdecode" if tune == "fast" else tune])
+                if tune in ("fast", "zerolatency"):
+                    args.extend(["-bf", "0"])
+            else:
+                # VAAPI-кодировщики не понимают -tune; B-кадры отключаем явно
+                args.extend(["-bf", "0"])
+        return args
+
+    def _svtav1_params(self, preset: int, tune: Optional[str] = None) -> str:
+        """Подбирает -svtav1-params по классу пресета и tune"""
+        params = self._svtav1_base_params(preset)
+        if tune and tune != "none":
+            # SVT-AV1 не понимает -tune — эквивалент добавляем в параметры
+            if "fast-decode=1" not in params:
+                params += ":fast-decode=1"
+            if tune == "zerolatency" and "lookahead=0" not in params:
+                params += ":lookahead=0"
+        return params
+
+    def _svtav1_base_params(self, preset: int) -> str:
+        """Базовые -svtav1-params по классу пресета"""
+        if preset <= 4:
+            return SVT_AV1_PARAMS["quality"]
+        if preset <= 8:
+            return SVT_AV1_PARAMS["balanced"]
+        return SVT_AV1_PARAMS["realtime"]
+
+    def _input_args(self, input_file: str, config: TestConfig) -> List[str]:
+        """Возвращает часть команды до фильтров: ffmpeg, hwaccel, вход, -t"""
         cmd = [self.ffmpeg_path, "-y"]
-        
-        if config.hw == 1:
+
+        if config.hw == "vaapi":
             # Добавляем параметры аппаратного ускорения до входного файла
             cmd.extend([
                 "-hwaccel", "vaapi",
-                "-hwaccel_device", "/dev/dri/renderD128",
+                "-hwaccel_device", config.hw_device or "/dev/dri/renderD128",
                 "-hwaccel_output_format", "vaapi"
             ])
-        
-        # Добавляем входной файл
-        cmd.extend(["-i", input_file])
-        
-        # duration
-        if config.duration:
-            cmd.extend(["-t", str(config.duration)])
-        
-        if config.hw == 1:
-            # Добавляем фильтры масштабирования и FPS
-            filters = []
-            if config.scale != "original":
-                target_height = 1080 if config.scale == "1080p" else 2160
-                filters.append(f"scale_vaapi=-2:{target_height}")
-            if config.fps:
-                filters.append(f"fps={config.fps}")
-            
-            if filters:
-                cmd.extend(["-vf", f"format=vaapi,hwupload,{','.join(filters)}"])
-            else:
-                cmd.extend(["-vf", "format=vaapi,hwupload"])
-
-            # Добавляем кодировщик и параметры качества
-            if config.codec == "x265":
-                cmd.extend([
-                    "-c:v", "hevc_vaapi",
-                    "-qp", str(config.qp),
-                    "-preset", str(config.preset)
-                ])
-            elif config.codec == "x264":
-                cmd.extend([
-                    "-c:v", "h264_vaapi",
-                    "-qp", str(config.qp),
-                    "-preset", str(config.preset)
-                ])
-            elif config.codec == "av1":
-                cmd.extend([
-                    "-c:v", "av1_vaapi",
-                    "-qp", str(config.qp),
-                    "-preset", str(config.preset)
-                ])
-            else:
-                cmd.extend([
-                    "-c:v", f"{config.codec}_vaapi",
-                    "-qp", str(config.qp),
-                    "-preset", str(config.preset)
-                ])
-            
-            # Копируем аудио поток без перекодирования
-            cmd.extend(["-c:a", "copy"])
+        elif config.hw == "nvenc":
+            cmd.extend(["-hwaccel", "cuda", "-hwaccel_output_format", "cuda"])
+            if config.hw_device:
+                cmd.extend(["-hwaccel_device", config.hw_device])
+        elif config.hw == "qsv":
+            cmd.extend(["-hwaccel", "qsv", "-hwaccel_output_format", "qsv"])
+            if config.hw_device:
+                cmd.extend(["-qsv_device", config.hw_device])
         else:
-            # Программное кодирование
-            if config.codec == "x265":
-                cmd.extend(["-c:v", "libx265"])
-                if config.crf is not None:
-                    cmd.extend(["-crf", str(config.crf)])
-                else:
-                    cmd.extend(["-qp", str(config.qp)])
-                cmd.extend(["-preset", str(config.preset)])
-            elif config.codec == "x264":
-                cmd.extend(["-c:v", "libx264"])
-                if config.crf is not None:
-                    cmd.extend(["-crf", str(config.crf)])
-                else:
-                    cmd.extend(["-qp", str(config.qp)])
-                cmd.extend(["-preset", str(config.preset)])
-            elif config.codec == "av1":
-                cmd.extend(["-c:v", "libsvtav1"])
-                if config.crf is not None:
-                    cmd.extend(["-crf", str(config.crf)])
-                else:
-                    cmd.extend(["-qp", str(config.qp)])
-                cmd.extend(["-preset", str(config.preset)])
-            else:
-                cmd.extend([
-                    "-c:v", config.codec,
-                    "-qp", str(config.qp),
-                    "-preset", str(config.preset)
-                ])
-            
-            # Добавляем фильтры для программного кодирования
-            filters = []
-            if config.scale != "original":
-                filters.append(self._get_scale_filter(config.scale, 0, 0))
-            if config.fps:
-                filters.append(f"fps={config.fps}")
-            
-            if filters:
-                cmd.extend(["-vf", ",".join(filters)])
-            
-            # Добавляем параметры качества
+            # swscale в фильтр-графе исторически однопоточен — даём фильтрам
+            # несколько потоков, пока кодировщик не занял все ядра.
+            # Для HW не нужно: масштабирование там выполняет GPU
+            filter_threads = str(max(2, (os.cpu_count() or 1) // 4))
             cmd.extend([
-                "-c:a", "copy"
+                "-filter_threads", filter_threads,
+                "-filter_complex_threads", filter_threads
             ])
-        
+
+        # duration: как опция входа (-t ДО -i) ограничение действует на само
+        # чтение файла и потому на все выходы сразу; после -i это опция
+        # выхода и в батч-команде ограничивала бы только первый выход
+        if config.duration:
+            cmd.extend(["-t", str(config.duration)])
+
+        # Добавляем входной файл
+        cmd.extend(["-i", input_file])
+        return cmd
+
+    def _build_ffmpeg_command(self, input_file: str, output_file: str, config: TestConfig) -> List[str]:
+        """Строит команду FFmpeg"""
+        cmd = self._input_args(input_file, config)
+
+        # Добавляем фильтры масштабирования и FPS
+        filters = self._video_filters(input_file, config)
+        if filters:
+            cmd.extend(["-vf", ",".join(filters)])
+
+        cmd.extend(self._encoder_args(config))
+
+        # Копируем аудио поток без перекодирования
+        cmd.extend(["-c:a", "copy"])
+
+        if self.benchmark:
+            # Муксим в никуда: скорость кодирования измеряется без влияния
+            # дисковой записи. Нуль-муксер не пишет байтов, поэтому размер
+            # выходного файла в этом режиме принципиально недоступен
+            cmd.extend(["-f", "null"])
+
         cmd.append(output_file)
         return cmd
 
-    def _get_file_size(self, file_path: str) -> int:
-        """Получает размер файла в байтах"""
-        return os.path.getsize(file_path)
+    def _build_batch_command(self, input_file: str, jobs: List[tuple]) -> List[str]:
+        """Строит одну команду FFmpeg с несколькими выходами.
+
+        jobs — список пар (config, output_file); все конфигурации обязаны
+        иметь одинаковые hw/scale/fps/duration, поэтому конвейер
+        демультиплексирование+декодирование+фильтры общий, а split раздаёт
+        кадры каждому кодировщику.
+        """
+        first = jobs[0][0]
+        cmd = self._input_args(input_file, first)
+
+        filters = self._video_filters(input_file, first)
+        n = len(jobs)
+        if filters and n > 1:
+            # Общая цепочка фильтров выполняется один раз, split — на выходе
+            pads = "".join(f"[v{i}]" for i in range(n))
+            cmd.extend(["-filter_complex", f"[0:v]{','.join(filters)},split={n}{pads}"])
+
+        for i, (config, output_file) in enumerate(jobs):
+            if filters and n > 1:
+                cmd.extend(["-map", f"[v{i}]"])
+            else:
+                cmd.extend(["-map", "0:v"])
+                if filters:
+                    cmd.extend(["-vf", ",".join(filters)])
+            cmd.extend(self._encoder_args(config))
+            cmd.extend(["-map", "0:a?", "-c:a", "copy"])
+            cmd.append(output_file)
+        return cmd
 
     def _calculate_bitrate(self, file_size: int, duration: float) -> float:
         """Вычисляет битрейт в Mbps"""
@@ -253,63 +587,76 @@ class FFmpegQPTest:
 
     def _calculate_compression_ratio(self, input_size: int, output_size: int) -> float:
         """Вычисляет коэффициент сжатия"""
-        return input_size / output_size
+        return input_size / output_size if output_size else 0.0
 
-    def _parse_ffmpeg_time(self, timestr: str) -> float:
-        """Преобразует строку времени вида 00:00:01.04 в секунды"""
-        h, m, s = timestr.split(":")
-        return int(h) * 3600 + int(m) * 60 + float(s)
+    def _metadata_key(self, input_file: str) -> tuple:
+        """Ключ кэша метаданных: реальный путь + mtime + размер файла"""
+        real_path = os.path.realpath(input_file)
+        st = os.stat(real_path)
+        return (real_path, st.st_mtime_ns, st.st_size)
 
-    def _get_duration(self, input_file: str) -> float:
-        """Определяет длительность видео через ffmpeg"""
-        cmd = [self.ffmpeg_path, "-i", input_file]
-        proc = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE, universal_newlines=True)
-        out, err = proc.communicate()
-        match = re.search(r"Duration: (\d{2}:\d{2}:\d{2}\.\d+)", err)
-        if match:
-            return self._parse_ffmpeg_time(match.group(1))
-        else:
-            raise RuntimeError("Не удалось определить длительность видео")
+    def _probe_input(self, input_file: str) -> Dict[str, Any]:
+        """Получает метаданные файла одним вызовом ffprobe (с кэшированием).
 
-    def _get_input_info(self, input_file: str) -> Dict[str, Any]:
-        """Получает информацию о входном видеофайле через ffprobe"""
+        ffprobe с -show_streams -show_format возвращает и длительность, и
+        параметры потоков за один запуск — в разы дешевле, чем отдельный
+        ffmpeg -i ради строки Duration в stderr.
+        """
+        key = self._metadata_key(input_file)
+        cached = self._probe_cache.get(key)
+        if cached is not None:
+            return cached
         cmd = [
             "ffprobe",
             "-v", "error",
-            "-select_streams", "v:0",
-            "-show_entries", "stream=width,height,r_frame_rate,bit_rate,codec_name,codec_long_name",
+            "-show_streams",
+            "-show_format",
             "-of", "json",
             input_file
         ]
-        
+        result = subprocess.run(cmd, capture_output=True, text=True, check=True)
+        probe = json.loads(result.stdout)
+        self._probe_cache[key] = probe
+        return probe
+
+    def _get_duration(self, input_file: str) -> float:
+        """Определяет длительность видео через ffprobe"""
         try:
-            result = subprocess.run(cmd, capture_output=True, text=True, check=True)
-            stream_info = json.loads(result.stdout)['streams'][0]
-            
+            probe = self._probe_input(input_file)
+            return float(probe['format']['duration'])
+        except (subprocess.CalledProcessError, json.JSONDecodeError, KeyError, ValueError):
+            raise RuntimeError("Не удалось определить длительность видео")
+
+    def _get_input_info(self, input_file: str) -> Dict[str, Any]:
+        """Получает информацию о входном видеофайле через ffprobe"""
+        try:
+            probe = self._probe_input(input_file)
+            stream_info = next(s for s in probe['streams'] if s.get('codec_type') == 'video')
+
             # Парсим FPS из строки вида "30000/1001"
             fps_parts = stream_info['r_frame_rate'].split('/')
             fps = float(fps_parts[0]) / float(fps_parts[1])
-            
+
             video_info = {
                 'width': stream_info['width'],
                 'height': stream_info['height'],
                 'fps': fps,
                 'bitrate': int(stream_info['bit_rate']) // 1000,  # конвертируем в kbps
-                'size': os.path.getsize(input_file),
+                'size': self._metadata_key(input_file)[2],
                 'codec': stream_info['codec_name'],
                 'codec_long_name': stream_info['codec_long_name']
             }
-            
+
             return video_info
-            
-        except (subprocess.CalledProcessError, json.JSONDecodeError, KeyError) as e:
+
+        except (subprocess.CalledProcessError, json.JSONDecodeError, KeyError, StopIteration) as e:
             print(f"Ошибка при получении информации о видео: {str(e)}")
             return {
                 'width': 0,
                 'height': 0,
                 'fps': 0,
                 'bitrate': 0,
-                'size': os.path.getsize(input_file),
+                'size': self._metadata_key(input_file)[2],
                 'codec': 'unknown',
                 'codec_long_name': 'Unknown codec'
             }
@@ -328,97 +675,261 @@ class FFmpegQPTest:
         print(f"Кодек: {info['codec']} ({info['codec_long_name']})")
         print("=" * 50)
 
+    def _output_file_name(self, config: TestConfig) -> str:
+        """Формирует имя выходного файла по всем различающим параметрам теста.
+
+        Имя обязано быть уникальным в пределах серии: тесты выполняются
+        параллельно, и два конфига с одним именем писали бы один файл
+        одновременно, портя результаты обоих.
+        """
+        qp_part = f"qp{config.qp}" if config.qp else ""
+        crf_part = f"crf{config.crf}" if config.crf is not None else ""
+        preset_part = f"preset{config.preset}" if config.preset is not None else ""
+        fps_part = f"fps{config.fps}" if config.fps else ""
+        mode_part = config.hw if config.hw != "none" else "sw"
+        tune_part = f"tune{config.tune}" if config.tune and config.tune != "none" else ""
+        duration_part = f"t{config.duration}" if config.duration else ""
+        smode_part = f"sm{config.scale_mode}" if config.scale_mode else ""
+        # От пути устройства оставляем только имя узла: renderD129 и т.п.
+        device_part = os.path.basename(config.hw_device) if config.hw_device else ""
+        parts = [qp_part, crf_part, preset_part, config.codec, config.scale,
+                 fps_part, mode_part, smode_part, device_part, tune_part,
+                 duration_part]
+        name = "_".join([p for p in parts if p])
+        return f"output_{name}.mp4"
+
+    def _execute_encode(self, cmd: List[str], hw: str) -> float:
+        """Выполняет команду FFmpeg, возвращает время кодирования"""
+        print(f"\nВыполняется команда: {' '.join(cmd)}")
+
+        # Аппаратные тесты сериализуем: параллельные кодирования на одном
+        # GPU-движке только мешают друг другу
+        semaphore = self._hw_semaphores.get(hw)
+        if semaphore is not None:
+            semaphore.acquire()
+        try:
+            # Засекаем время начала кодирования
+            start_time = time.time()
+
+            if self.quiet:
+                # Прогресс не нужен — не гоняем каждую лог-строку ffmpeg
+                # через пайп в Python; оставляем только хвост stderr
+                # для диагностики при ошибке
+                result = subprocess.run(
+                    cmd[:1] + ["-nostats"] + cmd[1:],
+                    stdout=subprocess.DEVNULL,
+                    stderr=subprocess.PIPE,
+                    text=True
+                )
+                ffmpeg_output = collections.deque(
+                    (line.strip() for line in result.stderr.splitlines() if line.strip()),
+                    maxlen=256
+                )
+                returncode = result.returncode
+                encoding_time = time.time() - start_time
+            else:
+                returncode, ffmpeg_output = self._run_with_progress(cmd)
+                encoding_time = time.time() - start_time
+        finally:
+            if semaphore is not None:
+                semaphore.release()
+
+        if returncode != 0:
+            self._print_encode_failure(ffmpeg_output, hw, returncode)
+
+        return encoding_time
+
+    def _run_with_progress(self, cmd: List[str]):
+        """Выполняет FFmpeg с выводом прогресса, возвращает (код, хвост вывода)"""
+        # Никаких preexec_fn/env/cwd: с аргументами по умолчанию CPython
+        # запускает процесс через posix_spawn (~0.3мс) вместо fork (~5мс
+        # на большом RSS) — на коротких тестах это заметно. Если ffmpeg
+        # понадобится переменная окружения, задавайте её снаружи, а не
+        # через env=, иначе Popen откатится на fork
+        process = subprocess.Popen(
+            cmd,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            close_fds=True
+        )
+
+        # Читаем вывод неблокирующе через selectors вместо построчного
+        # readline: один системный вызов забирает сразу до 64КБ вместо
+        # блокировки на каждой строке прогресса. Храним только хвост
+        # вывода — для диагностики хватает последних строк, а полный лог
+        # длинного кодирования бессмысленно раздувает память
+        ffmpeg_output = collections.deque(maxlen=256)
+        selector = selectors.DefaultSelector()
+        selector.register(process.stdout, selectors.EVENT_READ)
+        selector.register(process.stderr, selectors.EVENT_READ)
+        buffers = {process.stdout: "", process.stderr: ""}
+        while selector.get_map():
+            for key, _ in selector.select():
+                stream = key.fileobj
+                chunk = os.read(stream.fileno(), 65536)
+                if not chunk:
+                    selector.unregister(stream)
+                    continue
+                buffers[stream] += chunk.decode("utf-8", errors="replace")
+                # ffmpeg перерисовывает строку прогресса через \r
+                lines = buffers[stream].replace("\r", "\n").split("\n")
+                buffers[stream] = lines.pop()
+                for line in lines:
+                    line = line.strip()
+                    if not line:
+                        continue
+                    ffmpeg_output.append(line)
+                    if "time=" in line:
+                        print(f"\rПрогресс: {line}", end="")
+        selector.close()
+        for tail in buffers.values():
+            if tail.strip():
+                ffmpeg_output.append(tail.strip())
+        process.wait()
+        print()
+        return process.returncode, ffmpeg_output
+
+    def _print_encode_failure(self, ffmpeg_output, hw: str, returncode: int):
+        """Печатает диагностику неудачного кодирования и поднимает ошибку"""
+        error_msg = "\n".join(ffmpeg_output)
+        print("\nПодробный вывод FFmpeg:")
+        print("-" * 80)
+        print(error_msg)
+        print("-" * 80)
+
+        # Проверяем наличие VAAPI
+        if hw == "vaapi" and "vaapi" in error_msg.lower():
+            print("\nВозможные проблемы с VAAPI:")
+            print("1. Проверьте, что драйверы VAAPI установлены:")
+            print("   sudo apt-get install intel-media-va-driver-non-free")
+            print("2. Проверьте, что устройство доступно:")
+            print("   ls -l /dev/dri/renderD128")
+            print("3. Проверьте, что пользователь в группе video:")
+            print("   groups $USER")
+            print("4. Проверьте поддержку кодека:")
+            print("   ffmpeg -hide_banner -hwaccels")
+            print("   ffmpeg -hide_banner -encoders | grep vaapi")
+
+        raise RuntimeError(f"Ошибка при выполнении FFmpeg (код возврата: {returncode})")
+
     def run_test(self, input_file: str, config: Dict[str, Any]) -> TestResult:
         """Выполняет один тест кодирования"""
         if not os.path.exists(input_file):
             raise FileNotFoundError(f"Входной файл не найден: {input_file}")
 
-        # Выводим информацию о входном файле перед первым тестом
-        if not self.results:
-            self.print_input_info(input_file)
-
         test_config = self._validate_config(config)
-        # Формируем имя файла с учетом qp, crf, preset, codec, scale
-        qp_part = f"qp{test_config.qp}" if test_config.qp else ""
-        crf_part = f"crf{test_config.crf}" if test_config.crf is not None else ""
-        preset_part = f"preset{test_config.preset}" if test_config.preset is not None else ""
-        parts = [qp_part, crf_part, preset_part, test_config.codec, test_config.scale]
-        name = "_".join([p for p in parts if p])
-        output_file = f"output_{name}.mp4"
-        
+        output_file = "/dev/null" if self.benchmark else self._output_file_name(test_config)
+
         # Получаем длительность входного видео
         duration = self._get_duration(input_file)
 
         # Строим и выполняем команду кодирования
         cmd = self._build_ffmpeg_command(input_file, output_file, test_config)
-        print(f"\nВыполняется команда: {' '.join(cmd)}")
-        
-        # Засекаем время начала кодирования
-        start_time = time.time()
-        
-        process = subprocess.Popen(
-            cmd,
-            stdout=subprocess.PIPE,
-            stderr=subprocess.PIPE,
-            universal_newlines=True
-        )
+        encoding_time = self._execute_encode(cmd, test_config.hw)
 
-        # Собираем весь вывод FFmpeg
-        ffmpeg_output = []
-        while True:
-            if process.stderr is None:
-                break
-            output = process.stderr.readline()
-            if output == '' and process.poll() is not None:
-                break
-            if output:
-                ffmpeg_output.append(output.strip())
-                if "time=" in output:
-                    print(f"\rПрогресс: {output.strip()}", end="")
-        print()
+        # Собираем результаты. В режиме --benchmark файла нет (нуль-муксер
+        # сообщает total_size=N/A), поэтому размер/битрейт/сжатие честно
+        # помечаем недоступными вместо подстановки нулей
+        if self.benchmark:
+            output_size = None
+        else:
+            output_size = os.stat(output_file).st_size
+        input_size = os.stat(input_file).st_size
 
-        # Вычисляем время кодирования
-        encoding_time = time.time() - start_time
-
-        if process.returncode != 0:
-            error_msg = "\n".join(ffmpeg_output)
-            print("\nПодробный вывод FFmpeg:")
-            print("-" * 80)
-            print(error_msg)
-            print("-" * 80)
-            
-            # Проверяем наличие VAAPI
-            if test_config.hw == 1 and "vaapi" in error_msg.lower():
-                print("\nВозможные проблемы с VAAPI:")
-                print("1. Проверьте, что драйверы VAAPI установлены:")
-                print("   sudo apt-get install intel-media-va-driver-non-free")
-                print("2. Проверьте, что устройство доступно:")
-                print("   ls -l /dev/dri/renderD128")
-                print("3. Проверьте, что пользователь в группе video:")
-                print("   groups $USER")
-                print("4. Проверьте поддержку кодека:")
-                print("   ffmpeg -hide_banner -hwaccels")
-                print("   ffmpeg -hide_banner -encoders | grep vaapi")
-            
-            raise RuntimeError(f"Ошибка при выполнении FFmpeg (код возврата: {process.returncode})")
-
-        # Собираем результаты
-        input_size = self._get_file_size(input_file)
-        output_size = self._get_file_size(output_file)
-        
         return TestResult(
             input_file=input_file,
             output_file=output_file,
             config=test_config,
             file_size=output_size,
-            bitrate=self._calculate_bitrate(output_size, duration),
-            compression_ratio=self._calculate_compression_ratio(input_size, output_size),
+            bitrate=self._calculate_bitrate(output_size, duration) if output_size is not None else None,
+            compression_ratio=self._calculate_compression_ratio(input_size, output_size) if output_size is not None else None,
             duration=duration,
             encoding_time=encoding_time
         )
 
-    def print_results(self):
-        """Выводит таблицу результатов"""
+    @staticmethod
+    def _pipeline_key(tc: TestConfig) -> tuple:
+        """Ключ группировки батча: все поля конфига, влияющие на общую часть
+        команды (декодер, устройство, фильтры — см. _input_args и
+        _video_filters). Тесты с разными значениями любого из этих полей
+        нельзя вешать на один конвейер: батч строится по первому конфигу
+        группы, и чужие параметры молча бы не применились.
+        """
+        return (tc.hw, tc.hw_device, tc.scale, tc.scale_mode, tc.fps, tc.duration)
+
+    def run_batch(self, input_file: str, configs: List[Dict[str, Any]]) -> List[TestResult]:
+        """Выполняет несколько тестов минимальным числом команд FFmpeg.
+
+        Конфигурации с одинаковым конвейером декодирования/фильтрации
+        (см. _pipeline_key) кодируются одной командой с несколькими выходами:
+        вход демультиплексируется и декодируется один раз, что экономит
+        30-50% CPU на больших сериях.
+        """
+        if not os.path.exists(input_file):
+            raise FileNotFoundError(f"Входной файл не найден: {input_file}")
+
+        test_configs = [self._validate_config(dict(c)) for c in configs]
+        duration = self._get_duration(input_file)
+        input_size = os.stat(input_file).st_size
+
+        # Группируем по общей части конвейера (декодер + фильтры)
+        groups: Dict[Any, List[TestConfig]] = {}
+        for tc in test_configs:
+            groups.setdefault(self._pipeline_key(tc), []).append(tc)
+
+        results = []
+        for group in groups.values():
+            jobs = [(tc, self._output_file_name(tc)) for tc in group]
+            cmd = self._build_batch_command(input_file, jobs)
+            batch_time = self._execute_encode(cmd, group[0].hw)
+
+            # Все выходы группы кодируются одним процессом параллельно и имеют
+            # одинаковое число кадров (общие fps/duration), поэтому время
+            # батча делим между тестами поровну
+            per_test_time = batch_time / len(jobs)
+            for tc, output_file in jobs:
+                output_size = os.stat(output_file).st_size
+                results.append(TestResult(
+                    input_file=input_file,
+                    output_file=output_file,
+                    config=tc,
+                    file_size=output_size,
+                    bitrate=self._calculate_bitrate(output_size, duration),
+                    compression_ratio=self._calculate_compression_ratio(input_size, output_size),
+                    duration=duration,
+                    encoding_time=per_test_time
+                ))
+        return results
+
+    def add_result(self, result: TestResult):
+        """Добавляет результат и в список, и в колоночное (SoA) хранилище"""
+        self.results.append(result)
+        cols = self.results_columns
+        cols['file'].append(os.path.basename(result.output_file))
+        cols['qp'].append(result.config.qp)
+        cols['crf'].append(result.config.crf)
+        cols['preset'].append(result.config.preset)
+        cols['scale'].append(result.config.scale)
+        cols['fps'].append(result.config.fps)
+        cols['codec'].append(result.config.codec)
+        cols['mode'].append(result.config.hw.upper() if result.config.hw != 'none' else 'SW')
+        cols['size'].append(result.file_size)
+        cols['bitrate'].append(result.bitrate)
+        cols['ratio'].append(result.compression_ratio)
+        cols['time'].append(result.encoding_time)
+
+    @property
+    def results_df(self):
+        """Результаты как pandas.DataFrame (требует установленный pandas).
+
+        Колоночное хранилище конвертируется в DataFrame без перекладывания
+        по строкам — удобно для сортировок/перцентилей по большим сериям.
+        """
+        import pandas
+        return pandas.DataFrame(self.results_columns)
+
+    def print_results(self, sort_by: Optional[str] = None):
+        """Выводит таблицу результатов, при необходимости сортируя по колонке"""
         # Определяем ширину колонок
         col_widths = {
             'file': 40,    # Имя файла (увеличено для длинных имён)
@@ -457,45 +968,44 @@ class FFmpegQPTest:
         print(header)
         print("-" * len(header))
         
-        # Выводим результаты
-        for result in self.results:
-            # Форматируем размер файла
-            size_mb = result.file_size / 1024 / 1024
-            size_str = f"{size_mb:.1f} MB"
-            
-            # Форматируем битрейт
-            bitrate_str = f"{result.bitrate:.1f} Mbps"
-            
-            # Форматируем коэффициент сжатия
-            ratio_str = f"{result.compression_ratio:.1f}x"
-            
-            # Форматируем FPS
-            fps_str = str(result.config.fps) if result.config.fps else "-"
-            
-            # Форматируем время кодирования
-            time_str = f"{result.encoding_time:.1f}с"
-            
-            # CRF и PRESET
-            crf_str = str(result.config.crf) if result.config.crf is not None else "-"
-            preset_str = str(result.config.preset) if result.config.preset is not None else "-"
-            
-            # Формируем строку результата
+        # Выводим результаты по колоночному хранилищу: одна проходка по
+        # готовым спискам вместо цепочек атрибутных обращений на каждую ячейку
+        cols = self.results_columns
+        order = range(len(cols['file']))
+        if sort_by:
+            # Ключ устойчив к смешанным типам: None — в конец, числа и
+            # строки — отдельными группами (preset у av1 число, у x264/x265
+            # строка, и сравнивать их между собой нельзя)
+            column = cols[sort_by]
+            order = sorted(order, key=lambda i: (
+                column[i] is None, isinstance(column[i], str), column[i]
+            ))
+
+        for i in order:
+            fps_str = str(cols['fps'][i]) if cols['fps'][i] else "-"
+            crf_str = str(cols['crf'][i]) if cols['crf'][i] is not None else "-"
+            preset_str = str(cols['preset'][i]) if cols['preset'][i] is not None else "-"
+            size_str = f"{cols['size'][i] / 1024 / 1024:.1f} MB" if cols['size'][i] is not None else "-"
+            bitrate_str = f"{cols['bitrate'][i]:.1f} Mbps" if cols['bitrate'][i] is not None else "-"
+            ratio_str = f"{cols['ratio'][i]:.1f}x" if cols['ratio'][i] is not None else "-"
+            time_str = f"{cols['time'][i]:.1f}с"
+
             row = (
-                f"{os.path.basename(result.output_file):<{col_widths['file']}} "
-                f"{result.config.qp:<{col_widths['qp']}} "
+                f"{cols['file'][i]:<{col_widths['file']}} "
+                f"{cols['qp'][i]:<{col_widths['qp']}} "
                 f"{crf_str:<{col_widths['crf']}} "
                 f"{preset_str:<{col_widths['preset']}} "
-                f"{result.config.scale:<{col_widths['scale']}} "
+                f"{cols['scale'][i]:<{col_widths['scale']}} "
                 f"{fps_str:<{col_widths['fps']}} "
-                f"{result.config.codec:<{col_widths['codec']}} "
-                f"{'HW' if result.config.hw else 'SW':<{col_widths['mode']}} "
+                f"{cols['codec'][i]:<{col_widths['codec']}} "
+                f"{cols['mode'][i]:<{col_widths['mode']}} "
                 f"{size_str:<{col_widths['size']}} "
                 f"{bitrate_str:<{col_widths['bitrate']}} "
                 f"{ratio_str:<{col_widths['ratio']}} "
                 f"{time_str:<{col_widths['time']}}"
             )
             print(row)
-        
+
         # Выводим нижнюю границу таблицы
         print("=" * len(header))
 
@@ -539,9 +1049,14 @@ fps:
     - Если не указан, сохраняется оригинальная частота кадров
 
 hw:
-    - 1 - использование аппаратного ускорения (VAAPI)
-    - 0 - программное кодирование
+    - "vaapi" - аппаратное кодирование VAAPI (Intel/AMD)
+    - "nvenc" - аппаратное кодирование NVENC (NVIDIA)
+    - "qsv" - аппаратное кодирование Quick Sync
+    - "none" - программное кодирование
+    - 0/1 принимаются для совместимости (0 = none, 1 = vaapi)
     - При недоступности аппаратного ускорения автоматически переключается на программное
+    - hw_device позволяет направить тест на конкретное устройство
+      (например "/dev/dri/renderD129") — полезно на многогпушных машинах
 
 codec:
     - "x264" - H.264/AVC
@@ -553,6 +1068,12 @@ preset:
     - Для x264/x265: "ultrafast", "fast", "medium", "slow"
     - Для av1: число от 0 до 13 (по умолчанию 8)
 
+tune:
+    - "zerolatency" или "fastdecode" — меньше задержка и время кодирования
+      ценой степени сжатия
+    - "fast" — fastdecode без B-кадров
+    - Для av1 транслируется в -svtav1-params (fast-decode, lookahead)
+
 Возможные ошибки и их решения:
 
 1. "FFmpeg не найден в системе"
@@ -574,6 +1095,10 @@ preset:
     parser.add_argument("-i", "--input", required=True, help="Путь к исходному видеофайлу")
     parser.add_argument("-tests", required=True, help="JSON-массив конфигураций кодирования")
     parser.add_argument("-duration", type=int, default=None, help="Ограничить время теста (секунды), например 10 — только первые 10 секунд файла")
+    parser.add_argument("--batch", action="store_true", help="Кодировать тесты с одинаковыми scale/fps/hw одной командой FFmpeg (вход декодируется один раз)")
+    parser.add_argument("--quiet", action="store_true", help="Не выводить прогресс кодирования (дешевле: вывод FFmpeg не проходит через Python)")
+    parser.add_argument("--benchmark", action="store_true", help="Не записывать выходные файлы (-f null): чистое сравнение скорости кодирования; размер/битрейт/сжатие в таблице помечаются недоступными")
+    parser.add_argument("--sort-by", choices=["qp", "crf", "preset", "scale", "fps", "codec", "mode", "size", "bitrate", "ratio", "time"], default=None, help="Отсортировать таблицу результатов по колонке")
     
     # Устанавливаем ширину консоли для лучшего форматирования
     try:
@@ -591,16 +1116,40 @@ preset:
         if not isinstance(tests, list):
             raise ValueError("Параметр -tests должен быть JSON-массивом")
         
-        tester = FFmpegQPTest()
-        for i, test_config in enumerate(tests, 1):
-            print(f"\nТест {i} из {len(tests)}")
-            # duration из CLI имеет приоритет, если задан
-            if args.duration is not None:
+        if args.batch and args.benchmark:
+            raise ValueError("--benchmark не поддерживается вместе с --batch")
+
+        tester = FFmpegQPTest(quiet=args.quiet, benchmark=args.benchmark)
+        tester.print_input_info(args.input)
+
+        # duration из CLI имеет приоритет, если задан
+        if args.duration is not None:
+            for test_config in tests:
                 test_config["duration"] = args.duration
-            result = tester.run_test(args.input, test_config)
-            tester.results.append(result)
-        
-        tester.print_results()
+
+        if args.batch:
+            # Один вызов FFmpeg на группу тестов с общим конвейером декодирования
+            for result in tester.run_batch(args.input, tests):
+                tester.add_result(result)
+        else:
+            # Тесты независимы (каждый пишет свой output_file), поэтому запускаем
+            # их параллельно: ffmpeg — отдельный процесс, GIL не мешает.
+            # Аппаратные тесты дополнительно сериализуются семафором внутри run_test.
+            # max(1, ...) снаружи: при пустом списке тестов min() даёт 0,
+            # а деление на 0 воркеров роняло бы запуск
+            max_workers = max(1, min(len(tests), max(1, (os.cpu_count() or 1) // THREADS_PER_ENCODE)))
+            # Делим ядра по фактическому числу воркеров, а не по константе:
+            # одиночный тест получает всё, дюжина тестов — свою долю
+            tester.sw_threads = max(1, (os.cpu_count() or 1) // max_workers)
+            print(f"\nЗапуск {len(tests)} тестов, параллельно: {max_workers}")
+            with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
+                futures = [executor.submit(tester.run_test, args.input, cfg) for cfg in tests]
+                for i, future in enumerate(concurrent.futures.as_completed(futures), 1):
+                    result = future.result()
+                    print(f"\nТест завершён ({i} из {len(tests)}): {result.output_file}")
+                    tester.add_result(result)
+
+        tester.print_results(sort_by=args.sort_by)
         
     except json.JSONDecodeError:
         print("Ошибка: Некорректный JSON в параметре -tests")